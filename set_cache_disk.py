@@ -1,191 +1,554 @@
 import os
+import re
+import ctypes
+import errno
+import functools
+import string
+import json
 import platform
-import subprocess
+import sys
+import tempfile
 import logging
-from typing import List, Optional
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+from typing import Callable, Dict, List, Optional, Tuple
+
+# The host application owns logging configuration; call SetDiskCache.enable_debug_logging() to see output.
+logger = logging.getLogger('setdiskcache')
+logger.addHandler(logging.NullHandler())
+
+# Resolved once at import; the OS doesn't change during a Nuke session. sys.platform is a
+# compile-time constant, so platform.system() is only consulted for anything unexpected.
+if sys.platform == 'darwin':
+    _OS_NAME = 'Darwin'
+elif sys.platform.startswith('linux'):
+    _OS_NAME = 'Linux'
+elif sys.platform == 'win32':
+    _OS_NAME = 'Windows'
+else:
+    _OS_NAME = platform.system()
+
+# Per OS: how a preferred volume name maps to its mount point, and the directory volumes are
+# mounted under (scanned only if no mount table can be read).
+_OS_CONFIG: Dict[str, Tuple[Callable[[str], str], Optional[str]]] = {
+    'Darwin': (lambda volume: '/Volumes/' + volume, '/Volumes'),
+    'Linux': (lambda volume: '/mnt/' + volume, '/mnt'),  # Common mount point in Linux
+    'Windows': (lambda volume: f"{volume.upper()}:\\", None),  # Windows uses drive letters
+}
+
+# Matched exactly against the fs type field of the mount table, never as a substring of the line.
+NETWORK_FILESYSTEMS = frozenset({
+    'nfs', 'nfs4', 'smbfs', 'smb3', 'cifs', 'afp', 'afpfs', 'webdav', 'fuse.sshfs', 'fuse.rclone',
+})
+
+# Placeholder fs type of an automount trigger point. Until something touches the path, the real
+# (often network) filesystem isn't mounted there yet, so its type can't be checked.
+AUTOFS = 'autofs'
+
+# Matches a line of `mount` output in either the macOS or the Linux format, e.g.
+#   //user@server/share on /Volumes/share (smbfs, nodev, nosuid, mounted by user)
+#   server:/export on /mnt/share type nfs4 (rw,relatime)
+_MOUNT_LINE_RE = re.compile(
+    r'^.+? on (?P<mount_point>.+?) (?:type (?P<fs_type>\S+) \(|\((?P<bsd_fs_type>[^,)]+))'
 )
 
-class SetDiskCache:
+# /proc/self/mountinfo escapes whitespace and backslashes in paths as octal, e.g. '\040'.
+_MOUNTINFO_ESCAPE_RE = re.compile(rb'\\([0-7]{3})')
+
+# GetDriveTypeW return value for a remote (network) drive.
+DRIVE_REMOTE = 4
+
+# Absolute path of the `mount` fallback, so no PATH search is needed.
+_MOUNT_COMMAND = '/sbin/mount' if _OS_NAME == 'Darwin' else '/bin/mount'
+
+# getfsstat(2) flag to return cached filesystem info without refreshing (or triggering) mounts.
+MNT_NOWAIT = 2
+
+# expanduser() can go through pwd.getpwuid(), which is slow on NIS/LDAP-backed systems, so resolve it once.
+_HOME_DIR = os.path.expanduser('~')
+
+# Last successful resolution per host, so later Nuke sessions can skip probing entirely.
+_STATE_PATH = os.path.join(_HOME_DIR, '.cache', 'nuke_setdiskcache.json')
+
+
+class _Statfs(ctypes.Structure):
+    """macOS `struct statfs` (64-bit inode layout) as filled in by getfsstat(2)."""
+    _fields_ = [
+        ('f_bsize', ctypes.c_uint32),
+        ('f_iosize', ctypes.c_int32),
+        ('f_blocks', ctypes.c_uint64),
+        ('f_bfree', ctypes.c_uint64),
+        ('f_bavail', ctypes.c_uint64),
+        ('f_files', ctypes.c_uint64),
+        ('f_ffree', ctypes.c_uint64),
+        ('f_fsid', ctypes.c_int32 * 2),
+        ('f_owner', ctypes.c_uint32),
+        ('f_type', ctypes.c_uint32),
+        ('f_flags', ctypes.c_uint32),
+        ('f_fssubtype', ctypes.c_uint32),
+        ('f_fstypename', ctypes.c_char * 16),
+        ('f_mntonname', ctypes.c_char * 1024),
+        ('f_mntfromname', ctypes.c_char * 1024),
+        ('f_flags_ext', ctypes.c_uint32),
+        ('f_reserved', ctypes.c_uint32 * 7),
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _darwin_libc_function(name: str):
     """
-    A class to manage and set cache directories for applications like Nuke,
-    prioritizing local and writable volumes over network-mounted ones.
+    Returns the 64-bit inode variant of a libc function on macOS. Intel builds export it
+    with an '$INODE64' suffix, Apple Silicon only has the unsuffixed (already 64-bit) symbol.
+    """
+    # ctypes.util imports subprocess at module level, so it's only loaded when actually needed.
+    import ctypes.util
 
-    Features:
-        - Checks for preferred volumes and ensures they are suitable for caching.
-        - Detects if a volume is network-mounted by parsing mount information.
-        - Verifies write permissions on the target cache directory.
-        - Falls back to the user's home directory if no suitable volume is found.
-        - Supports OS-specific handling for macOS, Linux, and Windows (currently only macOS is implemented).
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    try:
+        return libc[f'{name}$INODE64']
+    except AttributeError:
+        return libc[name]
 
-    Attributes:
-        preferred_volumes (List[str]): List of preferred volume names to check. It will default 
-        to the first available volume that passes the checks so list them in order of preference.
-            e.g. PREFERRED_CACHE_DISKS = ['ReallyFastM2', 'LocalSSD', 'SlowRAID']
-        cache_dir (str): Relative path for the cache directory on the drive. It will be created if it doesn't exist.
-            e.g. CACHE_DIR = 'NukeCache' or CACHE_DIR = '.NukeCache' or CACHE_DIR = '_caches/nuke'
-        cache_path (Optional[str]): The resolved cache path after checks.
 
-    Notes: 
-        This has been tested extensively on macOS, but only basic checks have been implemented for Linux and Windows.
-        Please feel free to update the code to support more platforms or improve the existing checks.
+def _load_persisted_state() -> Dict[str, dict]:
+    try:
+        with open(_STATE_PATH, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _update_persisted_state(entry: Optional[dict]) -> None:
     """
-    def __init__(self, preferred_volumes: List[str], cache_dir: str):
-        self.preferred_volumes = preferred_volumes
-        self.cache_dir = cache_dir
-        self.cache_path: Optional[str] = None
-        logging.debug(f"DiskCache initialized with preferred_volumes: {self.preferred_volumes} and cache_dir: '{self.cache_dir}'")
-        self._handle_os_specific_cache_location()
+    Stores (or, with None, removes) this host's entry. The state file may be shared by several hosts
+    through a network home, so it is re-read right before merging rather than written back from the
+    copy loaded at import, and replaced atomically so a concurrent reader never sees a partial file.
+    """
+    global _persisted_state
+    state = _load_persisted_state()
+    if entry is None:
+        state.pop(platform.node(), None)
+    else:
+        state[platform.node()] = entry
+    _persisted_state = state
+
+    state_dir = os.path.dirname(_STATE_PATH)
+    tmp_path = None
+    try:
+        os.makedirs(state_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=state_dir, prefix='.nuke_setdiskcache.', suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, _STATE_PATH)
+    except OSError as e:
+        logger.warning("Unable to save cache state to '%s': %s", _STATE_PATH, e)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _save_persisted_state(volumes: Tuple[str, ...], cache_dir: str, mounts: List[list], cache_path: str) -> None:
+    _update_persisted_state({
+        'preferred_volumes': list(volumes),
+        'cache_dir': cache_dir,
+        'mounts': mounts,
+        'cache_path': cache_path,
+    })
+
+
+def _persisted_cache_path(
+    volumes: Tuple[str, ...], cache_dir: str, mount_table: Dict[str, str], mounts: List[list]
+) -> Optional[str]:
+    entry = _persisted_state.get(platform.node())
+    if not isinstance(entry, dict):
+        return None
+    if entry.get('preferred_volumes') != list(volumes) or entry.get('cache_dir') != cache_dir:
+        return None
+    if entry.get('mounts') != mounts:
+        logger.debug("Preferred volumes were mounted or unmounted since the last run. Probing again.")
+        return None
 
-    def _handle_os_specific_cache_location(self) -> None:
-        current_os = platform.system()
-        logging.debug(f"Detected operating system: {current_os}")
-
-        if current_os == 'Darwin':
-            self._set_cache_location_macos()
-        elif current_os == 'Linux':
-            self._set_cache_location_linux()
-        elif current_os == 'Windows':
-            self._set_cache_location_windows()
-        else:
-            logging.warning(f"Unsupported operating system: {current_os}. Skipping cache setup.")
+    cache_path = entry.get('cache_path')
+    if isinstance(cache_path, str) and os.path.isdir(cache_path) and os.access(cache_path, os.W_OK | os.X_OK):
+        if _preferred_volume_became_usable(volumes, cache_dir, mount_table, cache_path):
+            logger.debug("A volume preferred over '%s' is usable again. Probing again.", cache_path)
+            return None
+        return cache_path
 
-    def _set_cache_location_macos(self) -> None:
-        self.cache_path = self._find_suitable_cache_path_macos()
+    logger.debug("Persisted cache path '%s' is no longer writable. Probing again.", cache_path)
+    _update_persisted_state(None)
+    return None
 
-        if self.cache_path:
-            os.environ['NUKE_TEMP_DIR'] = self.cache_path
-            os.environ['NUKE_DISK_CACHE'] = self.cache_path
-            logging.info(f"Cache directories set: NUKE_TEMP_DIR and NUKE_DISK_CACHE -> {self.cache_path}")
-        else:
-            logging.error("Failed to set cache directories. No suitable path found.")
 
-    def _set_cache_location_linux(self) -> None:
-        self.cache_path = self._find_suitable_cache_path_linux()
+def _preferred_volume_became_usable(
+    volumes: Tuple[str, ...], cache_dir: str, mount_table: Dict[str, str], cache_path: str
+) -> bool:
+    """
+    The mount fingerprint can't tell that a volume ranked above the persisted path was skipped only
+    because its cache dir wasn't writable. Re-checks those volumes with os.access, without creating
+    anything, so fixing the permissions on a preferred volume is picked up on the next start.
+    """
+    volume_path_for = _OS_CONFIG[_OS_NAME][0]
+    for volume in volumes:
+        volume_path = volume_path_for(volume)
+        candidate = _volume_cache_path(volume_path, cache_dir)
+        if candidate == cache_path:
+            return False
 
-        if self.cache_path:
-            os.environ['NUKE_TEMP_DIR'] = self.cache_path
-            os.environ['NUKE_DISK_CACHE'] = self.cache_path
-            logging.info(f"Cache directories set: NUKE_TEMP_DIR and NUKE_DISK_CACHE -> {self.cache_path}")
-        else:
-            logging.error("Failed to set cache directories. No suitable path found.")
+        fs_type = mount_table.get(volume_path)
+        if fs_type is None or fs_type == AUTOFS or _is_network_drive(volume_path, mount_table):
+            continue
 
-    def _set_cache_location_windows(self) -> None:
-        self.cache_path = self._find_suitable_cache_path_windows()
+        # makedirs would need write access to the deepest part of the cache dir that already exists.
+        existing = candidate
+        while not os.path.exists(existing) and os.path.dirname(existing) != existing:
+            existing = os.path.dirname(existing)
+        if os.access(existing, os.W_OK | os.X_OK):
+            return True
 
-        if self.cache_path:
-            os.environ['NUKE_TEMP_DIR'] = self.cache_path
-            os.environ['NUKE_DISK_CACHE'] = self.cache_path
-            logging.info(f"Cache directories set: NUKE_TEMP_DIR and NUKE_DISK_CACHE -> {self.cache_path}")
-        else:
-            logging.error("Failed to set cache directories. No suitable path found.")
+    return False
 
-    def _find_suitable_cache_path_macos(self) -> Optional[str]:
-        for volume in self.preferred_volumes:
-            volume_path = os.path.join('/Volumes', volume)
-            if not os.path.ismount(volume_path):
-                logging.warning(f"Volume '{volume}' is not mounted.")
-                continue
 
-            if self._is_network_drive(volume_path):
-                logging.warning(f"Volume '{volume}' is a network drive. Skipping.")
-                continue
+def _mount_fingerprint(volumes: Tuple[str, ...], mount_table: Dict[str, str]) -> List[list]:
+    """
+    Describes how the preferred volumes are currently mounted. If this matches what was persisted,
+    probing would reach the same decision, so the persisted cache path can be reused as-is.
+    """
+    volume_path_for = _OS_CONFIG[_OS_NAME][0]
+    return [[volume_path_for(volume), mount_table.get(volume_path_for(volume))] for volume in volumes]
 
-            cache_path = os.path.join(volume_path, self.cache_dir)
-            if self._ensure_directory(cache_path) and self._is_writable(cache_path):
-                return cache_path
 
-        home_cache_path = os.path.join(os.path.expanduser('~'), self.cache_dir)
-        if self._ensure_directory(home_cache_path) and self._is_writable(home_cache_path):
-            return home_cache_path
+_persisted_state: Dict[str, dict] = _load_persisted_state()
 
-        return None
 
-    def _find_suitable_cache_path_linux(self) -> Optional[str]:
-        for volume in self.preferred_volumes:
-            volume_path = os.path.join('/mnt', volume)  # Common mount point in Linux
-            if not os.path.ismount(volume_path):
-                logging.warning(f"Volume '{volume}' is not mounted.")
-                continue
+@functools.lru_cache(maxsize=16)
+def _resolve_cache_path(volumes: Tuple[str, ...], cache_dir: str) -> Optional[str]:
+    """
+    Resolves the cache path for the preferred volumes and cache dir on this OS. Results are
+    memoized for the life of the process and persisted per host together with how the preferred
+    volumes were mounted, so later sessions skip probing until a volume is mounted or unmounted.
+    """
+    volume_root = _OS_CONFIG[_OS_NAME][1]
+    mount_table = _load_mount_table()
+    if not mount_table and volume_root:
+        mount_table = _scan_mount_points(volume_root, volumes)
+    mounts = _mount_fingerprint(volumes, mount_table)
 
-            if self._is_network_drive(volume_path):
-                logging.warning(f"Volume '{volume}' is a network drive. Skipping.")
-                continue
+    cache_path = _persisted_cache_path(volumes, cache_dir, mount_table, mounts)
+    if cache_path:
+        logger.debug("Using persisted cache path: %s", cache_path)
+        return cache_path
 
-            cache_path = os.path.join(volume_path, self.cache_dir)
-            if self._ensure_directory(cache_path) and self._is_writable(cache_path):
-                return cache_path
+    cache_path = _find_suitable_cache_path(volumes, cache_dir, mount_table) or _find_home_cache_path(cache_dir)
+    if cache_path:
+        _save_persisted_state(volumes, cache_dir, mounts, cache_path)
+    return cache_path
 
-        home_cache_path = os.path.join(os.path.expanduser('~'), self.cache_dir)
-        if self._ensure_directory(home_cache_path) and self._is_writable(home_cache_path):
-            return home_cache_path
 
-        return None
+def _find_suitable_cache_path(volumes: Tuple[str, ...], cache_dir: str, mount_table: Dict[str, str]) -> Optional[str]:
+    volume_path_for = _OS_CONFIG[_OS_NAME][0]
 
-    def _find_suitable_cache_path_windows(self) -> Optional[str]:
-        for volume in self.preferred_volumes:
-            volume_path = f"{volume}:\\"  # Windows uses drive letters
-            if not os.path.isdir(volume_path):
-                logging.warning(f"Volume '{volume}' is not accessible.")
-                continue
+    for volume in volumes:
+        volume_path = volume_path_for(volume)
+        if volume_path not in mount_table:
+            logger.warning("Volume '%s' is not mounted.", volume)
+            continue
 
-            cache_path = os.path.join(volume_path, self.cache_dir)
-            if self._ensure_directory(cache_path) and self._is_writable(cache_path):
-                return cache_path
+        # Creating the cache dir would fire the automounter and mount whatever is behind it unchecked.
+        if mount_table[volume_path] == AUTOFS:
+            logger.warning("Volume '%s' is an automount that isn't mounted yet. Skipping.", volume)
+            continue
 
-        home_cache_path = os.path.join(os.path.expanduser('~'), self.cache_dir)
-        if self._ensure_directory(home_cache_path) and self._is_writable(home_cache_path):
-            return home_cache_path
+        if _is_network_drive(volume_path, mount_table):
+            logger.warning("Volume '%s' is a network drive. Skipping.", volume)
+            continue
 
-        return None
+        cache_path = _volume_cache_path(volume_path, cache_dir)
+        if _ensure_directory(cache_path) and _is_writable(cache_path):
+            return cache_path
 
-    def _is_network_drive(self, volume_path: str) -> bool:
-        current_os = platform.system()
+    return None
 
-        if current_os == 'Darwin' or current_os == 'Linux':
-            try:
-                mount_output = subprocess.check_output(['mount'], text=True)
-                for line in mount_output.splitlines():
-                    if volume_path in line:
-                        network_filesystems = ['smbfs', 'nfs', 'afp', 'cifs', 'webdav']
-                        return any(fs_type in line for fs_type in network_filesystems)
-                return False
-            except subprocess.CalledProcessError as e:
-                logging.error(f"Error executing mount command: {e}")
-                return False
 
-        elif current_os == 'Windows':
+def _volume_cache_path(volume_path: str, cache_dir: str) -> str:
+    # cache_dir is known to be relative (checked in SetDiskCache.__init__), so plain concatenation is
+    # enough on POSIX. Windows keeps os.path.join for its drive-root separator rules.
+    if _OS_NAME == 'Windows':
+        return os.path.join(volume_path, cache_dir)
+    return volume_path + '/' + cache_dir
+
+
+def _find_home_cache_path(cache_dir: str) -> Optional[str]:
+    home_cache_path = os.path.join(_HOME_DIR, cache_dir)
+    if _ensure_directory(home_cache_path) and _is_writable(home_cache_path):
+        return home_cache_path
+
+    return None
+
+
+def _load_mount_table() -> Dict[str, str]:
+    """
+    Reads the system mount table once and returns a mapping of mount point to filesystem type,
+    which doubles as the set of mounted volumes. On Linux it is parsed straight from
+    /proc/self/mountinfo, on macOS it comes from getfsstat(2). Either falls back to `mount`.
+    On Windows it holds the drive roots from GetLogicalDrives(), with no fs type.
+    """
+    if _OS_NAME == 'Windows':
+        return _read_logical_drives()
+
+    if _OS_NAME == 'Darwin':
+        mount_table = _read_getfsstat()
+        if mount_table is not None:
+            return mount_table
+        return _read_mount_output()
+
+    try:
+        return _read_mountinfo('/proc/self/mountinfo')
+    except OSError as e:
+        logger.warning("Unable to read /proc/self/mountinfo, falling back to mount command: %s", e)
+        return _read_mount_output()
+
+
+def _add_mount(mount_table: Dict[str, str], mount_point: str, fs_type: str) -> None:
+    # A triggered automount is listed alongside its autofs entry; keep the real filesystem either way.
+    if fs_type == AUTOFS and mount_point in mount_table:
+        return
+    mount_table[mount_point] = fs_type
+
+
+def _read_mountinfo(mountinfo_path: str) -> Dict[str, str]:
+    mount_table: Dict[str, str] = {}
+    with open(mountinfo_path, 'rb') as f:
+        for line in f:
+            fields = line.rstrip(b'\n').split(b' ')
+            # The optional fields after field 6 vary in number, so the fs type
+            # is located relative to the ' - ' separator rather than by index.
             try:
-                output = subprocess.check_output(['net', 'use'], text=True)
-                return volume_path.lower() in output.lower()
-            except subprocess.CalledProcessError as e:
-                logging.error(f"Error executing net use command: {e}")
-                return False
+                separator = fields.index(b'-', 6)
+                mount_point = fields[4]
+                fs_type = fields[separator + 1]
+            except (ValueError, IndexError):
+                continue
+            mount_point = _MOUNTINFO_ESCAPE_RE.sub(lambda m: bytes([int(m.group(1), 8)]), mount_point)
+            _add_mount(mount_table, os.fsdecode(mount_point), os.fsdecode(fs_type))
+    return mount_table
+
+
+def _scan_mount_points(volume_root: str, volumes: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Fallback for when no mount table could be read. Lists volume_root once with scandir and
+    treats a preferred volume as mounted if its directory sits on a different device than the
+    root, which is what os.path.ismount() checks. The fs type is unknown, so it is left empty.
+    """
+    mount_table: Dict[str, str] = {}
+    try:
+        root_dev = os.stat(volume_root).st_dev
+        with os.scandir(volume_root) as it:
+            entries = {entry.name: entry for entry in it}
+
+        for volume in volumes:
+            entry = entries.get(volume)
+            if entry is None or not entry.is_dir(follow_symlinks=False):
+                continue
+            if entry.stat(follow_symlinks=False).st_dev != root_dev:
+                mount_table[entry.path] = ''
+    except OSError as e:
+        logger.warning("Unable to scan '%s' for mounted volumes: %s", volume_root, e)
+
+    return mount_table
+
 
+def _read_getfsstat() -> Optional[Dict[str, str]]:
+    try:
+        getfsstat = _darwin_libc_function('getfsstat')
+    except (OSError, AttributeError) as e:
+        logger.error("Unable to load getfsstat from libc: %s", e)
+        return None
+
+    # The first call only returns the number of mounted filesystems.
+    count = getfsstat(None, 0, MNT_NOWAIT)
+    if count < 0:
+        logger.error("getfsstat failed: %s", os.strerror(ctypes.get_errno()))
+        return None
+
+    stat_bufs = (_Statfs * count)()
+    count = getfsstat(stat_bufs, ctypes.sizeof(stat_bufs), MNT_NOWAIT)
+    if count < 0:
+        logger.error("getfsstat failed: %s", os.strerror(ctypes.get_errno()))
+        return None
+
+    mount_table: Dict[str, str] = {}
+    for sb in stat_bufs[:count]:
+        _add_mount(mount_table, os.fsdecode(sb.f_mntonname), os.fsdecode(sb.f_fstypename))
+    return mount_table
+
+
+def _read_logical_drives() -> Dict[str, str]:
+    bitmask = ctypes.windll.kernel32.GetLogicalDrives()
+    return {f"{letter}:\\": '' for i, letter in enumerate(string.ascii_uppercase) if bitmask & (1 << i)}
+
+
+def _read_mount_output() -> Dict[str, str]:
+    # Only needed when mountinfo/getfsstat are unavailable, so subprocess isn't imported at startup.
+    import subprocess
+
+    mount_table: Dict[str, str] = {}
+    try:
+        # Python's own fds are non-inheritable (PEP 446), so skipping the close_fds sweep is safe
+        # and avoids looping over every possible fd on hosts with a huge RLIMIT_NOFILE.
+        mount_output = subprocess.run(
+            [_MOUNT_COMMAND],
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
+            text=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.error("Error executing mount command: %s", e)
+        return mount_table
+
+    for line in mount_output.splitlines():
+        match = _MOUNT_LINE_RE.match(line)
+        if match:
+            _add_mount(mount_table, match.group('mount_point'), match.group('fs_type') or match.group('bsd_fs_type'))
+    return mount_table
+
+
+def _is_network_drive(volume_path: str, mount_table: Optional[Dict[str, str]] = None) -> bool:
+    # On macOS and Linux the fs type comes from the mount table rather than statfs() on the
+    # path itself, which would trigger the automounter for an autofs-managed volume.
+    if _OS_NAME == 'Darwin' or _OS_NAME == 'Linux':
+        return (mount_table or {}).get(volume_path) in NETWORK_FILESYSTEMS
+
+    elif _OS_NAME == 'Windows':
+        return ctypes.windll.kernel32.GetDriveTypeW(volume_path) == DRIVE_REMOTE
+
+    return False
+
+
+def _ensure_directory(path: str) -> bool:
+    try:
+        os.makedirs(path, exist_ok=True)
+        return True
+    except OSError as e:
+        logger.error("Failed to create directory '%s': %s", path, e)
         return False
 
-    def _ensure_directory(self, path: str) -> bool:
-        if os.path.isdir(path):
-            return True
 
+def _is_writable(path: str) -> bool:
+    if os.access(path, os.W_OK | os.X_OK):
+        return True
+
+    if hasattr(os, 'statvfs'):
         try:
-            os.makedirs(path, exist_ok=True)
-            logging.info(f"Directory '{path}' created successfully.")
-            return True
+            if os.statvfs(path).f_flag & os.ST_RDONLY:
+                logger.warning("Directory '%s' is on a read-only filesystem.", path)
+                return False
         except OSError as e:
-            logging.error(f"Failed to create directory '{path}': {e}")
+            logger.warning("Unable to stat filesystem for '%s': %s", path, e)
             return False
 
-    def _is_writable(self, path: str) -> bool:
-        test_file = os.path.join(path, '.write_test')
+    # access(2) can report false negatives (e.g. NFS with root-squash or ACLs), so confirm with a real write.
+    if hasattr(os, 'O_TMPFILE'):
+        # An unnamed file on Linux: no directory entry is created, so there's nothing to unlink.
         try:
-            with open(test_file, 'w') as f:
-                f.write('test')
-            os.remove(test_file)
-            return True
-        except IOError as e:
-            logging.warning(f"Directory '{path}' is not writable: {e}")
-            return False
+            fd = os.open(path, os.O_TMPFILE | os.O_RDWR, 0o600)
+        except OSError as e:
+            # EOPNOTSUPP: the filesystem lacks O_TMPFILE, EISDIR: the kernel predates it.
+            if e.errno not in (errno.EOPNOTSUPP, errno.EISDIR):
+                logger.warning("Directory '%s' is not writable: %s", path, e)
+                return False
+        else:
+            try:
+                os.write(fd, b'test')
+                return True
+            except OSError as e:
+                logger.warning("Directory '%s' is not writable: %s", path, e)
+                return False
+            finally:
+                os.close(fd)
+
+    try:
+        with tempfile.NamedTemporaryFile(dir=path, prefix='.write_test') as f:
+            f.write(b'test')
+        return True
+    except OSError as e:
+        logger.warning("Directory '%s' is not writable: %s", path, e)
+        return False
+
+
+class SetDiskCache:
+    """
+    A class to manage and set cache directories for applications like Nuke,
+    prioritizing local and writable volumes over network-mounted ones.
+
+    Features:
+        - Checks for preferred volumes and ensures they are suitable for caching.
+        - Detects if a volume is network-mounted by querying its filesystem type.
+        - Verifies write permissions on the target cache directory.
+        - Falls back to the user's home directory if no suitable volume is found.
+        - Supports OS-specific handling for macOS, Linux, and Windows (currently only macOS is implemented).
+
+    Attributes:
+        preferred_volumes (List[str]): List of preferred volume names to check. It will default 
+        to the first available volume that passes the checks so list them in order of preference.
+            e.g. PREFERRED_CACHE_DISKS = ['ReallyFastM2', 'LocalSSD', 'SlowRAID']
+        cache_dir (str): Relative path for the cache directory on the drive. It will be created if it doesn't exist.
+            e.g. CACHE_DIR = 'NukeCache' or CACHE_DIR = '.NukeCache' or CACHE_DIR = '_caches/nuke'
+        cache_path (Optional[str]): The resolved cache path after checks.
+
+    Notes: 
+        This has been tested extensively on macOS, but only basic checks have been implemented for Linux and Windows.
+        Please feel free to update the code to support more platforms or improve the existing checks.
+        Logging goes to the 'setdiskcache' logger and is silent unless the host configures it
+        or SetDiskCache.enable_debug_logging() is called.
+    """
+    _debug_handler: Optional[logging.Handler] = None
+
+    @classmethod
+    def enable_debug_logging(cls) -> None:
+        """Opts in to printing this module's log messages (DEBUG and up) to stderr."""
+        if cls._debug_handler is None:
+            cls._debug_handler = logging.StreamHandler()
+            cls._debug_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            logger.addHandler(cls._debug_handler)
+        logger.setLevel(logging.DEBUG)
+
+    def __init__(self, preferred_volumes: List[str], cache_dir: str):
+        if os.path.isabs(cache_dir):
+            raise ValueError(f"cache_dir must be relative to the volume, got '{cache_dir}'")
+
+        self.preferred_volumes = preferred_volumes
+        self.cache_dir = cache_dir
+        self.cache_path: Optional[str] = None
+        logger.debug("DiskCache initialized with preferred_volumes: %s and cache_dir: '%s'", self.preferred_volumes, self.cache_dir)
+        self._handle_os_specific_cache_location()
+
+    def _handle_os_specific_cache_location(self) -> None:
+        # A wrapper script (or an earlier instance) already configured Nuke; keep it if it's usable.
+        existing = os.environ.get('NUKE_DISK_CACHE')
+        if existing and os.path.isdir(existing) and os.access(existing, os.W_OK | os.X_OK):
+            self.cache_path = existing
+            # Every successful setup sets both, so a wrapper that only exported NUKE_DISK_CACHE still gets a temp dir.
+            if not os.environ.get('NUKE_TEMP_DIR'):
+                os.environ['NUKE_TEMP_DIR'] = existing
+            logger.info("NUKE_DISK_CACHE already set to %s. Skipping cache setup.", existing)
+            return
+
+        logger.debug("Detected operating system: %s", _OS_NAME)
+
+        if _OS_NAME not in _OS_CONFIG:
+            logger.warning("Unsupported operating system: %s. Skipping cache setup.", _OS_NAME)
+            return
+
+        self._set_cache_location()
+
+    def _set_cache_location(self) -> None:
+        self.cache_path = _resolve_cache_path(tuple(self.preferred_volumes), self.cache_dir)
+
+        if self.cache_path:
+            os.environ['NUKE_TEMP_DIR'] = self.cache_path
+            os.environ['NUKE_DISK_CACHE'] = self.cache_path
+            logger.info("Cache directories set: NUKE_TEMP_DIR and NUKE_DISK_CACHE -> %s", self.cache_path)
+        else:
+            logger.error("Failed to set cache directories. No suitable path found.")